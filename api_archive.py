@@ -0,0 +1,114 @@
+"""Enregistrement et rejeu des échanges avec l'API Ligue1+"""
+
+import json
+import logging
+import os
+import zipfile
+from collections import defaultdict
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple
+import requests
+from config import API_ARCHIVE_FILE
+
+ARCHIVE_INDEX = "index.json"
+
+class ReplayMissError(LookupError):
+    """Requête absente de l'archive rejouée (ne doit pas être traitée comme une erreur réseau)"""
+
+def _request_key(method: str, url: str, params: Optional[Dict[str, Any]]) -> Tuple:
+    """Clé d'identification d'une requête (méthode, URL, paramètres triés)"""
+    sorted_params = tuple(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+    return (method.upper(), url, sorted_params)
+
+class RecordingSession(requests.Session):
+    """Session HTTP qui enregistre chaque réponse dans une archive compressée"""
+
+    def __init__(self, archive_dir: str):
+        super().__init__()
+        os.makedirs(archive_dir, exist_ok=True)
+        self.archive_path = os.path.join(archive_dir, API_ARCHIVE_FILE)
+        self.metadata = {
+            'recorded_at': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        }
+        self._entries = []
+        self._archive = zipfile.ZipFile(self.archive_path, 'w', compression=zipfile.ZIP_DEFLATED)
+
+    def request(self, method, url, params=None, **kwargs):
+        response = super().request(method, url, params=params, **kwargs)
+
+        member = f"responses/{len(self._entries):05d}.body"
+        self._archive.writestr(member, response.content)
+
+        key_method, key_url, key_params = _request_key(method, url, params)
+        self._entries.append({
+            'method': key_method,
+            'url': key_url,
+            'params': [list(param) for param in key_params],
+            'status_code': response.status_code,
+            'reason': response.reason,
+            'headers': {'Content-Type': response.headers.get('Content-Type', '')},
+            'encoding': response.encoding,
+            'member': member
+        })
+        return response
+
+    def close(self):
+        """Écrit l'index et finalise l'archive"""
+        if self._archive is not None:
+            index = {'metadata': self.metadata, 'entries': self._entries}
+            self._archive.writestr(ARCHIVE_INDEX, json.dumps(index, indent=2, ensure_ascii=False))
+            self._archive.close()
+            self._archive = None
+            logging.info(f"{len(self._entries)} réponses API enregistrées dans {self.archive_path}")
+        super().close()
+
+@lru_cache(maxsize=None)
+def _load_archive(archive_path: str) -> Tuple[Dict[str, Any], Dict[Tuple, Tuple]]:
+    """
+    Charge une archive entièrement en mémoire (une seule fois par processus)
+
+    Returns:
+        (métadonnées, dict clé de requête -> réponses enregistrées dans l'ordre)
+    """
+    responses = defaultdict(list)
+    with zipfile.ZipFile(archive_path, 'r') as archive:
+        index = json.loads(archive.read(ARCHIVE_INDEX))
+        for entry in index.get('entries', []):
+            key = _request_key(entry['method'], entry['url'], dict(entry['params']))
+            responses[key].append((entry, archive.read(entry['member'])))
+
+    logging.info(f"{len(index.get('entries', []))} réponses API chargées depuis {archive_path}")
+    return index.get('metadata', {}), {key: tuple(items) for key, items in responses.items()}
+
+class ReplaySession(requests.Session):
+    """Session HTTP qui rejoue les réponses d'une archive sans accès réseau"""
+
+    def __init__(self, archive_dir: str):
+        super().__init__()
+        self.archive_path = os.path.abspath(os.path.join(archive_dir, API_ARCHIVE_FILE))
+        self.metadata, self._responses = _load_archive(self.archive_path)
+        self._positions = defaultdict(int)
+
+    def request(self, method, url, params=None, **kwargs):
+        key = _request_key(method, url, params)
+        recorded = self._responses.get(key)
+
+        if not recorded:
+            raise ReplayMissError(
+                f"Aucune réponse enregistrée pour {method.upper()} {url} {params}"
+            )
+
+        # Servir les réponses dans l'ordre d'enregistrement, la dernière est réutilisée
+        position = self._positions[key]
+        entry, content = recorded[min(position, len(recorded) - 1)]
+        self._positions[key] = position + 1
+
+        response = requests.Response()
+        response.status_code = entry['status_code']
+        response.reason = entry.get('reason')
+        response.headers.update(entry.get('headers', {}))
+        response.encoding = entry.get('encoding')
+        response.url = requests.Request(method, url, params=params).prepare().url
+        response._content = content
+        return response
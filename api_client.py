@@ -4,18 +4,25 @@ import requests
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
+from process_lock import SharedResultCache
 from config import LIGUE1_API_BASE, LIGUE1_API_ENDPOINT, TIMEZONE
 
 class Ligue1ApiClient:
     """Client pour l'API Ligue1+"""
     
-    def __init__(self):
+    def __init__(self, session: Optional[requests.Session] = None, shared_dir: Optional[str] = None):
+        """
+        Args:
+            session: Session HTTP à utiliser (ex: enregistrement/rejeu), par défaut une session réseau
+            shared_dir: Répertoire partagé entre processus pour dédupliquer les appels API
+        """
         self.base_url = LIGUE1_API_BASE
         self.endpoint = LIGUE1_API_ENDPOINT
-        self.session = requests.Session()
+        self.session = session if session is not None else requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
+        self.shared_cache = SharedResultCache(shared_dir) if shared_dir else None
     
     def get_matches(self, from_date: str, days_limit: int = 7, look_after: bool = True) -> Optional[Dict[str, Any]]:
         """
@@ -36,6 +43,14 @@ class Ligue1ApiClient:
             'lookAfter': str(look_after).lower()
         }
         
+        if self.shared_cache:
+            # Un seul processus interroge l'API pour une même fenêtre
+            return self.shared_cache.get_or_fetch(params, lambda: self._fetch_matches(params))
+        
+        return self._fetch_matches(params)
+    
+    def _fetch_matches(self, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Effectue l'appel API pour les paramètres donnés"""
         try:
             url = f"{self.base_url}{self.endpoint}"
             logging.info(f"Fetching matches from: {url}")
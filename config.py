@@ -17,3 +17,16 @@ EPG_OUTPUT_FILE = "ligue1_epg.xml"
 
 # Default match duration in minutes (if end time not available)
 DEFAULT_MATCH_DURATION = 120
+
+# Sharded output configuration (un fichier XMLTV par jour local)
+EPG_SHARDS_DIR = "epg_shards"
+EPG_SHARD_FILE_PATTERN = "ligue1_epg_{day}.xml"
+EPG_SHARDS_MANIFEST = "manifest.json"
+
+# Record/replay des échanges API (fichier créé dans le répertoire --record/--replay)
+API_ARCHIVE_FILE = "api_archive.zip"
+
+# Coordination entre processus concurrents (--shared-dir)
+SHARED_RESULT_DIR = None  # ex: "/tmp/ligue1_epg_shared" pour activer par défaut
+SHARED_RESULT_TTL = 300  # secondes pendant lesquelles un résultat partagé est réutilisé
+SHARED_LOCK_TIMEOUT = 300  # secondes d'attente maximale d'un verrou
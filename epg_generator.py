@@ -3,13 +3,18 @@
 import logging
 import sys
 import argparse
-from datetime import datetime, timedelta
+import time
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
+from typing import Dict
 
 from api_client import Ligue1ApiClient
+from api_archive import RecordingSession, ReplaySession
 from match_parser import MatchParser
 from xml_generator import XMLTVGenerator
-from config import EPG_OUTPUT_FILE
+from epg_shards import EPGShardWriter
+from xmltv_validator import XMLTVValidator
+from config import EPG_OUTPUT_FILE, EPG_SHARDS_DIR, SHARED_RESULT_DIR
 
 def setup_logging(verbose: bool = False) -> None:
     """Configure le logging"""
@@ -21,7 +26,15 @@ def setup_logging(verbose: bool = False) -> None:
         datefmt='%Y-%m-%d %H:%M:%S'
     )
 
-def generate_epg(days_ahead: int = 7, output_file: str = None, verbose: bool = False) -> bool:
+def log_metrics(metrics: Dict[str, float]) -> None:
+    """Affiche les durées de chaque étape de la génération"""
+    summary = ", ".join(f"{stage}={duration:.3f}s" for stage, duration in metrics.items())
+    logging.info(f"Métriques: {summary}")
+
+def generate_epg(days_ahead: int = 7, output_file: str = None, verbose: bool = False,
+                 shards_dir: str = None, validate: bool = False,
+                 record_dir: str = None, replay_dir: str = None,
+                 shared_dir: str = None) -> bool:
     """
     Génère l'EPG pour Ligue1+
     
@@ -29,6 +42,14 @@ def generate_epg(days_ahead: int = 7, output_file: str = None, verbose: bool = F
         days_ahead: Nombre de jours à récupérer à partir d'aujourd'hui
         output_file: Fichier de sortie (optionnel)
         verbose: Mode verbose
+        shards_dir: Si fourni, écrit un shard XMLTV par jour dans ce répertoire
+            au lieu du fichier unique
+        validate: Si True, valide l'arbre XMLTV avant écriture et n'écrit rien en cas d'erreur
+        record_dir: Si fourni, enregistre les échanges API dans une archive de ce répertoire
+        replay_dir: Si fourni, rejoue les échanges API de l'archive de ce répertoire sans réseau
+            (la fenêtre de dates enregistrée remplace days_ahead)
+        shared_dir: Répertoire partagé pour coordonner les appels API entre processus concurrents
+            (active aussi les écritures verrouillées et atomiques)
     
     Returns:
         True si succès, False sinon
@@ -38,45 +59,124 @@ def generate_epg(days_ahead: int = 7, output_file: str = None, verbose: bool = F
     if output_file is None:
         output_file = EPG_OUTPUT_FILE
     
+    metrics = {}
+    run_start = time.perf_counter()
+    session = None
+    # Les écritures ne sont verrouillées qu'en mode coordonné (--shared-dir)
+    coordinated = bool(shared_dir)
+    
     try:
         logging.info("=== Début de la génération EPG Ligue1+ ===")
         
         # Initialiser les composants
-        api_client = Ligue1ApiClient()
-        parser = MatchParser()
-        xml_generator = XMLTVGenerator()
+        if record_dir:
+            session = RecordingSession(record_dir)
+        elif replay_dir:
+            session = ReplaySession(replay_dir)
+        
+        if shared_dir and session is not None:
+            # L'enregistrement doit voir chaque requête et le rejeu n'accède pas au réseau
+            logging.info("Résultats partagés désactivés en mode enregistrement/rejeu")
+            shared_dir = None
+        
+        # En enregistrement/rejeu, figer l'instant de référence des préfixes
+        # temporels ([DEMAIN], [TERMINÉ]...) pour un EPG reproductible
+        reference_time = None
+        if session is not None and session.metadata.get('recorded_at'):
+            reference_time = datetime.strptime(
+                session.metadata['recorded_at'], '%Y-%m-%dT%H:%M:%SZ'
+            ).replace(tzinfo=timezone.utc)
         
-        # Calculer les dates
+        api_client = Ligue1ApiClient(session, shared_dir=shared_dir)
+        parser = MatchParser(reference_time)
+        xml_generator = XMLTVGenerator(reference_time)
+        
+        # Calculer les dates (en rejeu, reprendre la fenêtre enregistrée)
         start_date = datetime.now().date()
+        if replay_dir and session.metadata.get('start_date'):
+            start_date = datetime.strptime(session.metadata['start_date'], '%Y-%m-%d').date()
+            recorded_days = session.metadata.get('days_ahead', days_ahead)
+            if recorded_days != days_ahead:
+                logging.warning(f"Rejeu: fenêtre enregistrée de {recorded_days} jours utilisée au lieu de {days_ahead}")
+                days_ahead = recorded_days
+        elif record_dir:
+            session.metadata['start_date'] = start_date.isoformat()
+            session.metadata['days_ahead'] = days_ahead
         end_date = start_date + timedelta(days=days_ahead)
         
         logging.info(f"Récupération des matchs du {start_date} au {end_date}")
         
         # Récupérer les données
+        stage_start = time.perf_counter()
         api_data = api_client.get_matches_for_period(
             datetime.combine(start_date, datetime.min.time()),
             datetime.combine(end_date, datetime.min.time())
         )
         
+        metrics['fetch'] = time.perf_counter() - stage_start
+        
         if not api_data:
             logging.error("Impossible de récupérer les données de l'API")
             return False
         
         # Parser les matchs
+        stage_start = time.perf_counter()
         matches = parser.parse_matches(api_data)
+        metrics['parse'] = time.perf_counter() - stage_start
         
         if not matches:
             logging.warning("Aucun match Ligue1+ trouvé pour la période")
             # On génère quand même un EPG vide
         
-        # Générer le XML
-        xml_content = xml_generator.generate_epg(matches)
+        # Construire les arbres XMLTV en mémoire
+        stage_start = time.perf_counter()
+        if shards_dir:
+            # Un shard par jour local de la fenêtre
+            days = [start_date + timedelta(days=i) for i in range(days_ahead + 1)]
+            trees = xml_generator.build_daily_shard_trees(matches, days)
+        else:
+            trees = {None: (xml_generator.build_epg_tree(matches), len(matches))}
+        metrics['generate'] = time.perf_counter() - stage_start
+        
+        # Valider avant toute écriture
+        if validate:
+            stage_start = time.perf_counter()
+            # Les shards sont validés ensemble pour couvrir les chevauchements entre jours
+            errors = XMLTVValidator().validate_sequence([
+                (str(day) if day else None, root)
+                for day, (root, _) in sorted(trees.items(), key=lambda item: item[0] or date.min)
+            ])
+            metrics['validate'] = time.perf_counter() - stage_start
+            
+            if errors:
+                for error in errors:
+                    logging.error(f"Validation XMLTV: {error}")
+                logging.error(f"EPG invalide ({len(errors)} erreurs), aucun fichier écrit")
+                metrics['total'] = time.perf_counter() - run_start
+                log_metrics(metrics)
+                return False
+            
+            logging.info("Validation XMLTV réussie")
         
         # Sauvegarder
-        xml_generator.save_to_file(xml_content, output_file)
+        stage_start = time.perf_counter()
+        if shards_dir:
+            shards = {
+                day: (xml_generator.tree_to_string(root), programme_count)
+                for day, (root, programme_count) in trees.items()
+            }
+            # Uniquement les shards modifiés
+            EPGShardWriter(shards_dir, coordinated=coordinated).write_shards(shards)
+            output_file = shards_dir
+        else:
+            root, _ = trees[None]
+            xml_generator.save_to_file(xml_generator.tree_to_string(root), output_file, coordinated=coordinated)
+        metrics['write'] = time.perf_counter() - stage_start
+        metrics['total'] = time.perf_counter() - run_start
         
         logging.info(f"=== EPG généré avec succès: {output_file} ===")
         logging.info(f"Nombre de programmes: {len(matches)}")
+        log_metrics(metrics)
         
         # Afficher un résumé des matchs
         if matches and verbose:
@@ -91,6 +191,11 @@ def generate_epg(days_ahead: int = 7, output_file: str = None, verbose: bool = F
         if verbose:
             logging.exception("Détails de l'erreur:")
         return False
+    
+    finally:
+        # Finaliser l'archive d'enregistrement même en cas d'échec
+        if session is not None:
+            session.close()
 
 def main():
     """Point d'entrée principal"""
@@ -102,6 +207,11 @@ Exemples:
   python epg_generator.py                    # EPG pour 7 jours
   python epg_generator.py -d 14              # EPG pour 14 jours  
   python epg_generator.py -o my_epg.xml      # Fichier de sortie personnalisé
+  python epg_generator.py --shards epg_shards # Un fichier par jour + manifest
+  python epg_generator.py --validate         # Valide l'EPG avant écriture
+  python epg_generator.py --record runs/r1   # Enregistre les échanges API
+  python epg_generator.py --replay runs/r1   # Rejoue sans accès réseau
+  python epg_generator.py --shared-dir /tmp/ligue1_epg_shared  # Jobs concurrents
   python epg_generator.py -v                 # Mode verbose
         """
     )
@@ -119,6 +229,45 @@ Exemples:
         help=f'Fichier de sortie (défaut: {EPG_OUTPUT_FILE})'
     )
     
+    parser.add_argument(
+        '--shards',
+        type=str,
+        nargs='?',
+        const=EPG_SHARDS_DIR,
+        metavar='DIR',
+        help=f'Écrit un shard XMLTV par jour et un manifest dans DIR (défaut: {EPG_SHARDS_DIR})'
+    )
+    
+    parser.add_argument(
+        '--validate',
+        action='store_true',
+        help="Valide l'EPG (DTD XMLTV, chevauchements, ordre, horaires) avant écriture"
+    )
+    
+    archive_group = parser.add_mutually_exclusive_group()
+    
+    archive_group.add_argument(
+        '--record',
+        type=str,
+        metavar='DIR',
+        help='Enregistre toutes les requêtes/réponses API dans une archive compressée de DIR'
+    )
+    
+    archive_group.add_argument(
+        '--replay',
+        type=str,
+        metavar='DIR',
+        help="Rejoue les réponses API enregistrées dans DIR sans accès réseau"
+    )
+    
+    parser.add_argument(
+        '--shared-dir',
+        type=str,
+        default=SHARED_RESULT_DIR,
+        metavar='DIR',
+        help='Répertoire partagé entre instances: un seul processus interroge l\'API par fenêtre'
+    )
+    
     parser.add_argument(
         '-v', '--verbose',
         action='store_true',
@@ -139,7 +288,12 @@ Exemples:
     success = generate_epg(
         days_ahead=args.days,
         output_file=args.output,
-        verbose=args.verbose
+        verbose=args.verbose,
+        shards_dir=args.shards,
+        validate=args.validate,
+        record_dir=args.record,
+        replay_dir=args.replay,
+        shared_dir=args.shared_dir
     )
     
     sys.exit(0 if success else 1)
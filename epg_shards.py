@@ -0,0 +1,163 @@
+"""Écriture et fusion de l'EPG découpé par jour (shards + manifest)"""
+
+import hashlib
+import json
+import logging
+import os
+from datetime import date, datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple
+from lxml import etree
+from process_lock import FileLock, lock_path_for, write_atomic
+from config import (
+    CHANNEL_ID, TIMEZONE, EPG_SHARDS_DIR,
+    EPG_SHARD_FILE_PATTERN, EPG_SHARDS_MANIFEST
+)
+
+class EPGShardWriter:
+    """Gère un répertoire de shards XMLTV journaliers et leur manifest"""
+
+    def __init__(self, shards_dir: str = None, coordinated: bool = False):
+        """
+        Args:
+            shards_dir: Répertoire des shards
+            coordinated: Si True, sérialise les écritures entre processus par un verrou fichier
+        """
+        self.shards_dir = shards_dir or EPG_SHARDS_DIR
+        self.coordinated = coordinated
+        self.manifest_path = os.path.join(self.shards_dir, EPG_SHARDS_MANIFEST)
+
+    def load_manifest(self) -> Dict[str, Any]:
+        """
+        Charge le manifest existant
+
+        Returns:
+            Dict du manifest, vide si absent ou illisible
+        """
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logging.warning(f"Manifest illisible ({self.manifest_path}), reconstruction: {e}")
+            return {}
+
+    def write_shards(self, shards: Dict[date, Tuple[str, int]]) -> List[str]:
+        """
+        Écrit les shards modifiés et met à jour le manifest
+
+        Args:
+            shards: Dict jour -> (XML du shard, nombre de programmes)
+
+        Returns:
+            Liste des fichiers de shards réécrits
+        """
+        os.makedirs(self.shards_dir, exist_ok=True)
+
+        if not self.coordinated:
+            return self._write_shards(shards)
+
+        # Sérialiser les écritures concurrentes sur le même répertoire
+        with FileLock(lock_path_for(self.manifest_path)):
+            return self._write_shards(shards)
+
+    def _write_shards(self, shards: Dict[date, Tuple[str, int]]) -> List[str]:
+        """Écrit les shards et le manifest"""
+        previous = {
+            entry['date']: entry
+            for entry in self.load_manifest().get('shards', [])
+        }
+
+        entries = []
+        written = []
+
+        for day in sorted(shards):
+            xml_content, programme_count = shards[day]
+            content = xml_content.encode('utf-8')
+            sha256 = hashlib.sha256(content).hexdigest()
+
+            day_str = day.isoformat()
+            filename = EPG_SHARD_FILE_PATTERN.format(day=day_str)
+            path = os.path.join(self.shards_dir, filename)
+
+            # Ne réécrire que les shards dont le contenu a changé
+            old_entry = previous.get(day_str)
+            if not (old_entry and old_entry.get('sha256') == sha256 and os.path.exists(path)):
+                write_atomic(path, content)
+                written.append(filename)
+
+            entries.append({
+                'date': day_str,
+                'file': filename,
+                'sha256': sha256,
+                'programmes': programme_count
+            })
+
+        manifest = {
+            'channel': CHANNEL_ID,
+            'timezone': TIMEZONE,
+            'generated_at': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'shards': entries
+        }
+        write_atomic(
+            self.manifest_path,
+            json.dumps(manifest, indent=2, ensure_ascii=False).encode('utf-8')
+        )
+
+        # Supprimer les shards sortis de la fenêtre, une fois le manifest
+        # publié pour qu'il ne référence jamais un fichier absent
+        current_files = {entry['file'] for entry in entries}
+        for old_entry in previous.values():
+            if old_entry.get('file') not in current_files:
+                try:
+                    os.remove(os.path.join(self.shards_dir, old_entry['file']))
+                    logging.info(f"Shard obsolète supprimé: {old_entry['file']}")
+                except FileNotFoundError:
+                    pass
+
+        logging.info(f"{len(written)}/{len(entries)} shards réécrits dans {self.shards_dir}")
+        return written
+
+    def merge_shards(self, start_day: Optional[date] = None, end_day: Optional[date] = None) -> str:
+        """
+        Assemble les shards d'une plage de jours en un seul EPG XMLTV
+
+        Args:
+            start_day: Premier jour inclus (défaut: premier shard)
+            end_day: Dernier jour inclus (défaut: dernier shard)
+
+        Returns:
+            String contenant le XML fusionné
+        """
+        entries = self.load_manifest().get('shards', [])
+        selected = [
+            entry for entry in entries
+            if (start_day is None or entry['date'] >= start_day.isoformat())
+            and (end_day is None or entry['date'] <= end_day.isoformat())
+        ]
+
+        if not selected:
+            raise ValueError(f"Aucun shard disponible pour la période {start_day} - {end_day}")
+
+        parser = etree.XMLParser(remove_blank_text=True)
+        merged_root = None
+
+        for entry in selected:
+            shard_root = etree.parse(os.path.join(self.shards_dir, entry['file']), parser).getroot()
+
+            if merged_root is None:
+                # Le premier shard fournit la racine et la définition du canal
+                merged_root = shard_root
+                continue
+
+            for programme in shard_root.iterfind('programme'):
+                merged_root.append(programme)
+
+        logging.info(f"Fusion de {len(selected)} shards ({selected[0]['date']} - {selected[-1]['date']})")
+
+        return etree.tostring(
+            merged_root,
+            encoding='utf-8',
+            xml_declaration=True,
+            pretty_print=True
+        ).decode('utf-8')
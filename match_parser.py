@@ -24,8 +24,14 @@ class MatchData:
 class MatchParser:
     """Parser pour les données de matchs Ligue1+"""
     
-    def __init__(self):
+    def __init__(self, reference_time: Optional[datetime] = None):
+        """
+        Args:
+            reference_time: Instant de référence (UTC) pour les préfixes temporels,
+                par défaut l'heure courante à chaque appel
+        """
         self.target_broadcaster = TARGET_BROADCASTER
+        self.reference_time = reference_time
     
     def parse_matches(self, api_data: Dict[str, Any]) -> List[MatchData]:
         """
@@ -184,7 +190,7 @@ class MatchParser:
             return base_title
         
         # Calculer la différence avec maintenant (en UTC)
-        now = datetime.now(timezone.utc)
+        now = self.reference_time or datetime.now(timezone.utc)
         match_utc = match_time.replace(tzinfo=timezone.utc)
         time_diff = match_utc - now
         
@@ -0,0 +1,84 @@
+"""Script pour assembler une plage de jours à partir des shards EPG"""
+
+import logging
+import sys
+import argparse
+from datetime import datetime
+
+from epg_shards import EPGShardWriter
+from config import EPG_SHARDS_DIR
+
+def parse_day(value: str):
+    """Convertit une date YYYY-MM-DD pour argparse"""
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Date invalide (attendu YYYY-MM-DD): {value}")
+
+def main():
+    """Point d'entrée principal"""
+    parser = argparse.ArgumentParser(
+        description="Fusion des shards EPG Ligue1+",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exemples:
+  python merge_shards.py -o full.xml                              # Tous les shards
+  python merge_shards.py --from 2025-08-29 --to 2025-08-30 -o we.xml
+  python merge_shards.py -s /srv/epg --from 2025-08-29            # Depuis un jour
+        """
+    )
+
+    parser.add_argument(
+        '-s', '--shards-dir',
+        type=str,
+        default=EPG_SHARDS_DIR,
+        help=f'Répertoire des shards (défaut: {EPG_SHARDS_DIR})'
+    )
+
+    parser.add_argument(
+        '--from',
+        dest='start_day',
+        type=parse_day,
+        help='Premier jour inclus (YYYY-MM-DD)'
+    )
+
+    parser.add_argument(
+        '--to',
+        dest='end_day',
+        type=parse_day,
+        help='Dernier jour inclus (YYYY-MM-DD)'
+    )
+
+    parser.add_argument(
+        '-o', '--output',
+        type=str,
+        help='Fichier de sortie (défaut: sortie standard)'
+    )
+
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
+    if args.start_day and args.end_day and args.start_day > args.end_day:
+        print("Erreur: --from doit précéder --to")
+        sys.exit(1)
+
+    try:
+        xml_content = EPGShardWriter(args.shards_dir).merge_shards(args.start_day, args.end_day)
+    except Exception as e:
+        logging.error(f"Erreur lors de la fusion des shards: {e}")
+        sys.exit(1)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(xml_content)
+        logging.info(f"EPG fusionné sauvegardé dans {args.output}")
+    else:
+        sys.stdout.write(xml_content)
+
+if __name__ == "__main__":
+    main()
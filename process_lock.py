@@ -0,0 +1,209 @@
+"""Coordination entre plusieurs processus du générateur (verrous fichiers et résultats partagés)"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Dict, Any, Callable, Optional
+from config import SHARED_LOCK_TIMEOUT, SHARED_RESULT_TTL
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+def lock_path_for(path: str) -> str:
+    """Chemin du fichier verrou (caché) associé à un fichier de sortie"""
+    directory, filename = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, f".{filename}.lock")
+
+def write_atomic(path: str, content: bytes) -> None:
+    """Écrit un fichier via un fichier temporaire pour ne jamais exposer un contenu partiel"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        # Ne pas laisser de fichier temporaire (ex: disque plein)
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+class FileLock:
+    """Verrou exclusif inter-processus basé sur un fichier"""
+
+    def __init__(self, path: str, timeout: float = None, poll_interval: float = 0.1):
+        self.path = path
+        self.timeout = SHARED_LOCK_TIMEOUT if timeout is None else timeout
+        self.poll_interval = poll_interval
+        self._fd = None
+
+    def acquire(self) -> None:
+        """Attend le verrou, lève TimeoutError au-delà du délai"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        deadline = time.monotonic() + self.timeout
+        waited = False
+
+        while True:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+
+            while True:
+                try:
+                    if fcntl is not None:
+                        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    else:
+                        msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    if time.monotonic() >= deadline:
+                        os.close(fd)
+                        raise TimeoutError(f"Verrou {self.path} non obtenu après {self.timeout}s")
+                    if not waited:
+                        logging.info(f"En attente du verrou {self.path}")
+                        waited = True
+                    time.sleep(self.poll_interval)
+
+            # Le fichier verrou a pu être supprimé (nettoyage) pendant l'attente:
+            # un verrou sur l'ancien fichier n'exclut plus personne, on recommence
+            if fcntl is None or self._is_current(fd):
+                break
+
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+        self._fd = fd
+
+    def _is_current(self, fd: int) -> bool:
+        """Vérifie que le descripteur verrouillé correspond toujours au fichier du chemin"""
+        try:
+            path_stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        fd_stat = os.fstat(fd)
+        return (fd_stat.st_ino, fd_stat.st_dev) == (path_stat.st_ino, path_stat.st_dev)
+
+    def release(self) -> None:
+        """Libère le verrou"""
+        if self._fd is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self) -> 'FileLock':
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.release()
+
+class SharedResultCache:
+    """
+    Single-flight inter-processus: un seul processus récupère une fenêtre donnée,
+    les autres attendent puis réutilisent son résultat depuis le répertoire partagé
+    """
+
+    def __init__(self, shared_dir: str, ttl: float = None):
+        self.shared_dir = shared_dir
+        self.ttl = SHARED_RESULT_TTL if ttl is None else ttl
+        os.makedirs(self.shared_dir, exist_ok=True)
+
+    def get_or_fetch(self, params: Dict[str, Any], fetch: Callable[[], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """
+        Retourne le résultat partagé pour ces paramètres, ou le récupère sous verrou
+
+        Args:
+            params: Paramètres identifiant la fenêtre demandée
+            fetch: Fonction de récupération, appelée au plus une fois à la fois par fenêtre
+
+        Returns:
+            Résultat partagé ou récupéré (None si la récupération échoue)
+        """
+        key = hashlib.sha1(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()
+        result_path = os.path.join(self.shared_dir, f"{key}.json")
+
+        # Chemin rapide: résultat récent déjà disponible
+        result = self._read_fresh(result_path)
+        if result is not None:
+            logging.info(f"Résultat partagé réutilisé pour {params}")
+            return result
+
+        with FileLock(os.path.join(self.shared_dir, f"{key}.lock")):
+            # Un autre processus a pu terminer la récupération pendant l'attente
+            result = self._read_fresh(result_path)
+            if result is not None:
+                logging.info(f"Résultat partagé réutilisé pour {params}")
+                return result
+
+            result = fetch()
+
+            # Seuls les succès sont partagés: en cas d'échec, le suivant réessaie
+            if result is not None:
+                write_atomic(result_path, json.dumps(result, ensure_ascii=False).encode('utf-8'))
+
+            self._remove_expired(exclude=key)
+
+            return result
+
+    def _remove_expired(self, exclude: str) -> None:
+        """Supprime les résultats (et verrous) plus anciens que le TTL"""
+        now = time.time()
+
+        for filename in os.listdir(self.shared_dir):
+            key, extension = os.path.splitext(filename)
+            if extension != '.lock' or key == exclude:
+                continue
+
+            lock_path = os.path.join(self.shared_dir, filename)
+            result_path = os.path.join(self.shared_dir, f"{key}.json")
+
+            # Âge du résultat, ou du verrou si aucune récupération n'a abouti
+            try:
+                reference_path = result_path if os.path.exists(result_path) else lock_path
+                if now - os.path.getmtime(reference_path) <= self.ttl:
+                    continue
+            except OSError:
+                continue
+
+            # Ne pas supprimer une entrée en cours de récupération par un autre processus
+            # (les processus déjà en attente sur ce verrou détectent sa suppression)
+            try:
+                entry_lock = FileLock(lock_path, timeout=0)
+                entry_lock.acquire()
+            except (TimeoutError, OSError):
+                continue
+
+            try:
+                # Sous Windows un fichier ouvert ne peut être supprimé: réessayé au prochain passage
+                for path in (result_path, lock_path):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                logging.debug(f"Résultat partagé expiré supprimé: {key}")
+            finally:
+                entry_lock.release()
+
+    def _read_fresh(self, path: str) -> Optional[Dict[str, Any]]:
+        """Lit un résultat partagé s'il est plus récent que le TTL"""
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
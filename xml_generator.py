@@ -1,19 +1,27 @@
 """Générateur XML pour l'EPG au format XMLTV"""
 
 import logging
-from datetime import datetime
-from typing import List, Dict, Any
+from datetime import datetime, date, timezone
+from typing import List, Dict, Any, Optional, Tuple
 from collections import defaultdict
+from dateutil import tz
 from lxml import etree
 from match_parser import MatchData
-from config import CHANNEL_ID, CHANNEL_NAME
+from process_lock import FileLock, lock_path_for, write_atomic
+from config import CHANNEL_ID, CHANNEL_NAME, TIMEZONE
 
 class XMLTVGenerator:
     """Générateur EPG au format XMLTV"""
     
-    def __init__(self):
+    def __init__(self, reference_time: Optional[datetime] = None):
+        """
+        Args:
+            reference_time: Instant de référence (UTC) pour les préfixes temporels,
+                par défaut l'heure courante à chaque appel
+        """
         self.channel_id = CHANNEL_ID
         self.channel_name = CHANNEL_NAME
+        self.reference_time = reference_time
     
     def generate_epg(self, matches: List[MatchData]) -> str:
         """
@@ -25,6 +33,56 @@ class XMLTVGenerator:
         Returns:
             String contenant le XML généré
         """
+        return self.tree_to_string(self.build_epg_tree(matches))
+    
+    def build_epg_tree(self, matches: List[MatchData]) -> etree.Element:
+        """
+        Construit l'arbre XMLTV en mémoire (avant sérialisation)
+        
+        Args:
+            matches: Liste des matchs à inclure
+        
+        Returns:
+            Élément racine <tv>
+        """
+        # Grouper les matchs par créneaux horaires et gérer les multiplex
+        programmes = self._create_programmes_with_multiplex(matches)
+        
+        root = self._build_tree(programmes)
+        
+        logging.info(f"Generated EPG XML with {len(programmes)} programmes")
+        return root
+    
+    def build_daily_shard_trees(self, matches: List[MatchData], days: List[date]) -> Dict[date, Tuple[etree.Element, int]]:
+        """
+        Construit en mémoire un arbre XMLTV par jour local (selon TIMEZONE)
+        
+        Args:
+            matches: Liste des matchs à inclure
+            days: Jours locaux pour lesquels produire un shard (même vides)
+        
+        Returns:
+            Dict jour -> (élément racine <tv>, nombre de programmes)
+        """
+        programmes = self._create_programmes_with_multiplex(matches)
+        
+        # Répartir les programmes par jour local de début
+        local_tz = tz.gettz(TIMEZONE)
+        programmes_by_day = defaultdict(list)
+        for programme in programmes:
+            start_utc = programme['start_time'].replace(tzinfo=timezone.utc)
+            programmes_by_day[start_utc.astimezone(local_tz).date()].append(programme)
+        
+        shards = {}
+        for day in sorted(set(days) | set(programmes_by_day)):
+            day_programmes = programmes_by_day.get(day, [])
+            shards[day] = (self._build_tree(day_programmes), len(day_programmes))
+        
+        logging.info(f"Generated {len(shards)} daily shards with {len(programmes)} programmes")
+        return shards
+    
+    def _build_tree(self, programmes: List[Dict[str, Any]]) -> etree.Element:
+        """Construit l'arbre XMLTV à partir des programmes"""
         # Créer l'élément racine avec attributs generator
         root = etree.Element("tv")
         root.set("generator-info-name", "Ligue1+ EPG Generator")
@@ -33,23 +91,20 @@ class XMLTVGenerator:
         # Ajouter le canal
         self._add_channel(root)
         
-        # Grouper les matchs par créneaux horaires et gérer les multiplex
-        programmes = self._create_programmes_with_multiplex(matches)
-        
         # Ajouter les programmes
         for programme in programmes:
             self._add_programme_element(root, programme)
         
-        # Convertir en string avec formatage
-        xml_string = etree.tostring(
+        return root
+    
+    def tree_to_string(self, root: etree.Element) -> str:
+        """Convertit l'arbre XMLTV en string avec formatage"""
+        return etree.tostring(
             root, 
             encoding='utf-8', 
             xml_declaration=True, 
             pretty_print=True
         ).decode('utf-8')
-        
-        logging.info(f"Generated EPG XML with {len(programmes)} programmes")
-        return xml_string
     
     def _add_channel(self, root: etree.Element) -> None:
         """Ajoute la définition du canal"""
@@ -175,7 +230,7 @@ class XMLTVGenerator:
         from datetime import datetime, timezone
         
         # Calculer la différence avec maintenant
-        now = datetime.now(timezone.utc)
+        now = self.reference_time or datetime.now(timezone.utc)
         match_utc = match_time.replace(tzinfo=timezone.utc)
         time_diff = match_utc - now
         
@@ -217,18 +272,8 @@ class XMLTVGenerator:
         desc = etree.SubElement(programme, "desc", lang="fr")
         desc.text = programme_data['description']
         
-        # Catégories
-        category_sport = etree.SubElement(programme, "category", lang="fr")
-        category_sport.text = "Sport"
-        
-        category_football = etree.SubElement(programme, "category", lang="fr")
-        category_football.text = "Football"
-        
-        if programme_data['championship']:
-            category_championship = etree.SubElement(programme, "category", lang="fr")
-            category_championship.text = programme_data['championship']
-        
         # Gestion différente selon le type de programme
+        # (les crédits précèdent les catégories dans le DTD XMLTV)
         if programme_data['type'] == 'single':
             # Match individuel - crédit avec équipes
             credits = etree.SubElement(programme, "credits")
@@ -246,7 +291,19 @@ class XMLTVGenerator:
             for match in programme_data['matches']:
                 presenter = etree.SubElement(credits, "presenter")
                 presenter.text = f"{match.home_team} vs {match.away_team}"
-            
+        
+        # Catégories
+        category_sport = etree.SubElement(programme, "category", lang="fr")
+        category_sport.text = "Sport"
+        
+        category_football = etree.SubElement(programme, "category", lang="fr")
+        category_football.text = "Football"
+        
+        if programme_data['championship']:
+            category_championship = etree.SubElement(programme, "category", lang="fr")
+            category_championship.text = programme_data['championship']
+        
+        if programme_data['type'] == 'multiplex':
             # Catégorie spéciale pour multiplex
             category_multiplex = etree.SubElement(programme, "category", lang="fr")
             category_multiplex.text = "Multiplex"
@@ -277,11 +334,23 @@ class XMLTVGenerator:
         timestamp = local_dt.strftime("%Y%m%d%H%M%S")
         return f"{timestamp} +0200"
     
-    def save_to_file(self, xml_content: str, filename: str) -> None:
-        """Sauvegarde l'EPG dans un fichier"""
+    def save_to_file(self, xml_content: str, filename: str, coordinated: bool = False) -> None:
+        """
+        Sauvegarde l'EPG dans un fichier
+        
+        Args:
+            xml_content: XML à écrire
+            filename: Fichier de sortie
+            coordinated: Si True, écriture atomique sérialisée entre processus
+                (verrou .<fichier>.lock, remplacement du fichier)
+        """
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(xml_content)
+            if coordinated:
+                with FileLock(lock_path_for(filename)):
+                    write_atomic(filename, xml_content.encode('utf-8'))
+            else:
+                with open(filename, 'w', encoding='utf-8') as f:
+                    f.write(xml_content)
             logging.info(f"EPG sauvegardé dans {filename}")
         except Exception as e:
             logging.error(f"Erreur lors de la sauvegarde: {e}")
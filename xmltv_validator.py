@@ -0,0 +1,245 @@
+"""Validation de l'EPG XMLTV en mémoire avant écriture"""
+
+import re
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from io import StringIO
+from typing import List, Optional, Tuple
+from lxml import etree
+
+# Sous-ensemble fidèle du DTD XMLTV (xmltv.dtd) couvrant les éléments
+# que les lecteurs IPTV valident
+XMLTV_DTD = """
+<!ELEMENT tv (channel*, programme*)>
+<!ATTLIST tv date CDATA #IMPLIED
+             source-info-url CDATA #IMPLIED
+             source-info-name CDATA #IMPLIED
+             source-data-url CDATA #IMPLIED
+             generator-info-name CDATA #IMPLIED
+             generator-info-url CDATA #IMPLIED>
+
+<!ELEMENT channel (display-name+, icon*, url*)>
+<!ATTLIST channel id CDATA #REQUIRED>
+
+<!ELEMENT display-name (#PCDATA)>
+<!ATTLIST display-name lang CDATA #IMPLIED>
+
+<!ELEMENT icon EMPTY>
+<!ATTLIST icon src CDATA #REQUIRED
+               width CDATA #IMPLIED
+               height CDATA #IMPLIED>
+
+<!ELEMENT url (#PCDATA)>
+<!ATTLIST url system CDATA #IMPLIED>
+
+<!ELEMENT programme (title+, sub-title*, desc*, credits?, date?,
+                     category*, keyword*, language?, orig-language?,
+                     length?, icon*, url*, country*, episode-num*,
+                     video?, audio?, previously-shown?, premiere?,
+                     last-chance?, new?, subtitles*, rating*,
+                     star-rating*, review*)>
+<!ATTLIST programme start CDATA #REQUIRED
+                    stop CDATA #IMPLIED
+                    pdc-start CDATA #IMPLIED
+                    vps-start CDATA #IMPLIED
+                    showview CDATA #IMPLIED
+                    videoplus CDATA #IMPLIED
+                    channel CDATA #REQUIRED
+                    clumpidx CDATA "0/1">
+
+<!ELEMENT title (#PCDATA)>
+<!ATTLIST title lang CDATA #IMPLIED>
+
+<!ELEMENT sub-title (#PCDATA)>
+<!ATTLIST sub-title lang CDATA #IMPLIED>
+
+<!ELEMENT desc (#PCDATA)>
+<!ATTLIST desc lang CDATA #IMPLIED>
+
+<!ELEMENT credits (director*, actor*, writer*, adapter*, producer*,
+                   composer*, editor*, presenter*, commentator*, guest*)>
+<!ELEMENT director (#PCDATA)>
+<!ELEMENT actor (#PCDATA)>
+<!ATTLIST actor role CDATA #IMPLIED
+                guest (yes | no) #IMPLIED>
+<!ELEMENT writer (#PCDATA)>
+<!ELEMENT adapter (#PCDATA)>
+<!ELEMENT producer (#PCDATA)>
+<!ELEMENT composer (#PCDATA)>
+<!ELEMENT editor (#PCDATA)>
+<!ELEMENT presenter (#PCDATA)>
+<!ELEMENT commentator (#PCDATA)>
+<!ELEMENT guest (#PCDATA)>
+
+<!ELEMENT date (#PCDATA)>
+
+<!ELEMENT category (#PCDATA)>
+<!ATTLIST category lang CDATA #IMPLIED>
+
+<!ELEMENT keyword (#PCDATA)>
+<!ATTLIST keyword lang CDATA #IMPLIED>
+
+<!ELEMENT language (#PCDATA)>
+<!ATTLIST language lang CDATA #IMPLIED>
+
+<!ELEMENT orig-language (#PCDATA)>
+<!ATTLIST orig-language lang CDATA #IMPLIED>
+
+<!ELEMENT length (#PCDATA)>
+<!ATTLIST length units (seconds | minutes | hours) #REQUIRED>
+
+<!ELEMENT country (#PCDATA)>
+<!ATTLIST country lang CDATA #IMPLIED>
+
+<!ELEMENT episode-num (#PCDATA)>
+<!ATTLIST episode-num system CDATA "onscreen">
+
+<!ELEMENT video (present?, colour?, aspect?, quality?)>
+<!ELEMENT present (#PCDATA)>
+<!ELEMENT colour (#PCDATA)>
+<!ELEMENT aspect (#PCDATA)>
+<!ELEMENT quality (#PCDATA)>
+
+<!ELEMENT audio (present?, stereo?)>
+<!ELEMENT stereo (#PCDATA)>
+
+<!ELEMENT previously-shown EMPTY>
+<!ATTLIST previously-shown start CDATA #IMPLIED
+                           channel CDATA #IMPLIED>
+
+<!ELEMENT premiere (#PCDATA)>
+<!ATTLIST premiere lang CDATA #IMPLIED>
+
+<!ELEMENT last-chance (#PCDATA)>
+<!ATTLIST last-chance lang CDATA #IMPLIED>
+
+<!ELEMENT new EMPTY>
+
+<!ELEMENT subtitles (language?)>
+<!ATTLIST subtitles type (teletext | onscreen | deaf-signed) #IMPLIED>
+
+<!ELEMENT rating (value, icon*)>
+<!ATTLIST rating system CDATA #IMPLIED>
+
+<!ELEMENT value (#PCDATA)>
+
+<!ELEMENT star-rating (value, icon*)>
+<!ATTLIST star-rating system CDATA #IMPLIED>
+
+<!ELEMENT review (#PCDATA)>
+<!ATTLIST review type (text | url) #REQUIRED
+                 source CDATA #IMPLIED
+                 reviewer CDATA #IMPLIED
+                 lang CDATA #IMPLIED>
+"""
+
+# Format XMLTV: YYYYMMDDHHMMSS suivi d'un décalage optionnel +HHMM/-HHMM
+XMLTV_TIME_PATTERN = re.compile(r'^(\d{14})(?: ([+-])(\d{2})(\d{2}))?$')
+
+@lru_cache(maxsize=None)
+def get_xmltv_dtd() -> etree.DTD:
+    """Compile le DTD XMLTV une seule fois par processus"""
+    return etree.DTD(StringIO(XMLTV_DTD))
+
+class XMLTVValidator:
+    """Validateur de l'arbre XMLTV (DTD + contrôles structurels)"""
+
+    def __init__(self):
+        self.dtd = get_xmltv_dtd()
+
+    def validate(self, root: etree.Element) -> List[str]:
+        """
+        Valide un arbre XMLTV en mémoire
+
+        Args:
+            root: Élément racine <tv>
+
+        Returns:
+            Liste des erreurs détectées (vide si l'EPG est valide)
+        """
+        return self.validate_sequence([(None, root)])
+
+    def validate_sequence(self, trees: List[Tuple[Optional[str], etree.Element]]) -> List[str]:
+        """
+        Valide des arbres XMLTV consécutifs (ex: shards journaliers) comme un seul guide
+
+        Le DTD est vérifié par arbre, l'ordre et les chevauchements sur la
+        séquence complète des programmes de chaque canal.
+
+        Args:
+            trees: Liste ordonnée de (libellé de l'arbre ou None, élément racine <tv>)
+
+        Returns:
+            Liste des erreurs détectées (vide si l'EPG est valide)
+        """
+        errors = []
+        programmes_by_channel = defaultdict(list)
+
+        for tree_label, root in trees:
+            prefix = f"[{tree_label}] " if tree_label else ""
+
+            # Validation DTD
+            if not self.dtd.validate(root):
+                for entry in self.dtd.error_log.filter_from_errors():
+                    errors.append(f"{prefix}DTD ligne {entry.line}: {entry.message}")
+
+            # Contrôles structurels par programme
+            channel_ids = {channel.get('id') for channel in root.iterfind('channel')}
+
+            for index, programme in enumerate(root.iterfind('programme'), 1):
+                channel = programme.get('channel')
+                label = f"{prefix}Programme #{index} ({channel})"
+
+                if channel not in channel_ids:
+                    errors.append(f"{label}: canal inconnu")
+
+                start = self._parse_xmltv_time(programme.get('start'))
+                if start is None:
+                    errors.append(f"{label}: heure de début invalide '{programme.get('start')}'")
+                    continue
+
+                # L'heure de fin est optionnelle en XMLTV
+                stop = None
+                if programme.get('stop') is not None:
+                    stop = self._parse_xmltv_time(programme.get('stop'))
+                    if stop is None:
+                        errors.append(f"{label}: heure de fin invalide '{programme.get('stop')}'")
+                        continue
+                    if stop <= start:
+                        errors.append(f"{label}: fin ({programme.get('stop')}) avant ou égale au début ({programme.get('start')})")
+
+                programmes_by_channel[channel].append((start, stop, label))
+
+        # Tri et chevauchements sur toute la séquence, y compris aux frontières entre arbres
+        for channel, programmes in programmes_by_channel.items():
+            for (prev_start, prev_stop, prev_label), (start, stop, label) in zip(programmes, programmes[1:]):
+                if start < prev_start:
+                    errors.append(f"{label}: non trié, commence avant {prev_label}")
+                elif prev_stop is not None and start < prev_stop:
+                    errors.append(f"{label}: chevauche {prev_label}")
+
+        return errors
+
+    def _parse_xmltv_time(self, value: Optional[str]) -> Optional[datetime]:
+        """Parse une heure XMLTV en datetime UTC, None si malformée"""
+        if not value:
+            return None
+
+        match = XMLTV_TIME_PATTERN.match(value)
+        if not match:
+            return None
+
+        timestamp, sign, hours, minutes = match.groups()
+
+        offset = timedelta()
+        if sign:
+            offset = timedelta(hours=int(hours), minutes=int(minutes))
+            if sign == '-':
+                offset = -offset
+
+        try:
+            dt = datetime.strptime(timestamp, "%Y%m%d%H%M%S")
+            return dt.replace(tzinfo=timezone(offset)).astimezone(timezone.utc)
+        except ValueError:
+            return None